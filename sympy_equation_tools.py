@@ -1,11 +1,13 @@
 from __future__ import division, print_function
-from sympy import *
+from sympy import Eq
+from sympy.core.cache import cacheit, clear_cache
 r"""
 Minimal version of sympy_relational_tools with only the functions for equations.
 Works with sympy >= 0.7.4.1
 
 """
 
+@cacheit
 def add_equations(equation1,equation2):
     r"""
     Adds each side of two equations and returns the resulting equation.
@@ -30,6 +32,7 @@ def add_equations(equation1,equation2):
     """
     return Eq( equation1.lhs + equation2.lhs, equation1.rhs+equation2.rhs )
 
+@cacheit
 def sub_equations(equation1,equation2):
     r"""
     Subtracts each side of two equations and returns the resulting equation.
@@ -54,6 +57,7 @@ def sub_equations(equation1,equation2):
     """
     return Eq( equation1.lhs - equation2.lhs, equation1.rhs-equation2.rhs )
 
+@cacheit
 def mul_equations(equation1,equation2):
     r"""
     Multiplies each side of two equations and returns the resulting equation.
@@ -78,6 +82,7 @@ def mul_equations(equation1,equation2):
     """
     return Eq( equation1.lhs * equation2.lhs, equation1.rhs*equation2.rhs )
 
+@cacheit
 def div_equations(equation1,equation2):
     r"""
     Divides each side of two equations and returns the resulting equation.
@@ -107,6 +112,7 @@ def div_equations(equation1,equation2):
 
 
 
+@cacheit
 def both_sides(equation,function,argument=None):
     r"""
     Applies a `function` with an `argument` to a `equation` and returns the resulting one.
@@ -129,6 +135,7 @@ def both_sides(equation,function,argument=None):
     Examples
     ========
     ```python
+    >>> from sympy import *
     >>> from sympy_equation_tools import *
     >>> x,y = symbols('x,y',real=True)
     >>> a = symbols('a',positive=True)
@@ -1,104 +1,13 @@
 from __future__ import division, print_function
-from sympy import *
+from sympy import (Eq, Ge, Le, Gt, Lt, Add, Mul, Pow, S, sympify, solveset,
+    Complement, Union, factor, simplify, collect, expand, together, apart)
+from sympy.core.cache import cacheit, clear_cache
+from sympy.core.logic import fuzzy_bool
+from sympy_equation_tools import add_equations, sub_equations, mul_equations, div_equations
+from sympy_equation_tools import both_sides as _both_sides_eq
 
 _inverse_relations = { Ge: Le, Le: Ge, Gt: Lt, Lt: Gt }
 
-def add_equations(equation1,equation2):
-    r"""
-    Adds each side of two equations and returns the resulting equation.
-
-    Parameters
-    ==========
-    equation1 : Equality
-    equation2 : Equality
-
-    Examples
-    ========
-    ```python
-    >>> from sympy import *
-    >>> from sympy_relational_tools import *
-    >>> x,y = symbols('x,y',real=True)
-
-    >>> eq1 = Eq(x+10, 4*y-2)
-    >>> eq2 = Eq(sin(x)+5*x, -y**2)
-    >>> add_equations(eq1,eq2)
-    Eq(-4*x - sin(x) + 10, y**2 + 4*y - 2)
-    ```
-    """
-    return Eq( equation1.lhs + equation2.lhs, equation1.rhs+equation2.rhs )
-
-def sub_equations(equation1,equation2):
-    r"""
-    Subtracts each side of two equations and returns the resulting equation.
-
-    Parameters
-    ==========
-    equation1 : Equality | minuend
-    equation2 : Equality | subtrahend
-
-    Example
-    =======
-    ```python
-    >>> from sympy import *
-    >>> from sympy_relational_tools import *
-    >>> x,y = symbols('x,y',real=True)
-
-    >>> eq1 = Eq(x+5, y-3)
-    >>> eq2 = Eq(x, 10*y)
-    >>> sub_equations(eq1,eq2)
-    Eq(5, -9*y - 3)
-    ```
-    """
-    return Eq( equation1.lhs - equation2.lhs, equation1.rhs-equation2.rhs )
-
-def mul_equations(equation1,equation2):
-    r"""
-    Multiplies each side of two equations and returns the resulting equation.
-
-    Parameters
-    ==========
-    equation1 : Equality
-    equation2 : Equality
-
-    Example
-    =======
-    ```python
-    >>> from sympy import *
-    >>> from sympy_relational_tools import *
-    >>> x,y = symbols('x,y',real=True)
-
-    >>> eq1 = Eq(x+5, x**2)
-    >>> eq2 = Eq(y+10*x, 6)
-    >>> mul_equations(eq1,eq2)
-    Eq((x + 5)*(10*x + y), 6*x**2)
-    ```
-    """
-    return Eq( equation1.lhs * equation2.lhs, equation1.rhs*equation2.rhs )
-
-def div_equations(equation1,equation2):
-    r"""
-    Divides each side of two equations and returns the resulting equation.
-
-    Parameters
-    ==========
-    equation1 : Equality | dividend
-    equation2 : Equality | divisor
-
-    Example
-    =======
-    ```python
-    >>> from sympy import *
-    >>> from sympy_relational_tools import *
-    >>> x,y,th = symbols(r'x,y,theta',real=True)
-
-    >>> eq1 = Eq(sin(th), y)
-    >>> eq2 = Eq(cos(th), x)
-    >>> div_equations(eq1,eq2)
-    Eq(sin(theta)/cos(theta), y/x)
-    ```
-    """
-    return Eq( equation1.lhs/equation2.lhs, equation1.rhs/equation2.rhs )
-
 
 def invert_ineq(ineq):
     r"""
@@ -127,7 +36,54 @@ def invert_ineq(ineq):
     return _inverse_relations[ineq.func]( -ineq.lhs, -ineq.rhs, evaluate=False)
 
 
-def _both_sides_add_ineq(relation,argument):
+def _sign(expr):
+    r"""
+    Returns 1 if `expr` is positive, -1 if it is negative and None if its sign can't
+    be determined from the assumptions.
+    """
+    if fuzzy_bool(expr.is_positive):
+        return 1
+    elif fuzzy_bool(expr.is_negative):
+        return -1
+    return None
+
+@cacheit
+def _solve_sign(expr,variable,interval,sign):
+    r"""
+    Returns the subset of `interval` where `expr` is positive (`sign` 1), negative
+    (`sign` -1) or zero (`sign` 0).
+
+    Each query is cached on its own, since `solveset` dominates the cost of `both_sides`
+    when an `interval` is given.
+    """
+    if sign > 0:
+        return solveset(expr>0,variable,domain=interval)
+    elif sign < 0:
+        return solveset(expr<0,variable,domain=interval)
+    return solveset(expr,variable,domain=interval)
+
+def _sign_intervals(expr,variable,interval):
+    r"""
+    Returns the subsets of `interval` where `expr` is positive, negative and zero,
+    as a tuple `(positive, negative, zeros)`.
+
+    For polynomials in `variable`, which are defined and continuous everywhere, the
+    negative set is the complement of the other two, which saves one of the three
+    `solveset` calls. Only the Mul rule needs all three sets; the reciprocal rule
+    queries the positive and negative sets of each side through `_solve_sign`, which
+    still takes two `solveset` calls per side.
+    """
+    expr = sympify(expr)
+    positive = _solve_sign(expr,variable,interval,1)
+    zeros = _solve_sign(expr,variable,interval,0)
+    if expr.free_symbols <= {variable} and expr.is_polynomial(variable):
+        negative = Complement(interval,Union(positive,zeros))
+    else:
+        negative = _solve_sign(expr,variable,interval,-1)
+    return positive, negative, zeros
+
+
+def _both_sides_add_ineq(relation,argument,interval=None,variable=None):
     r"""
     Adds `argument` to each side of `relation`, according to the property
     $ x>y \implies x + c > y + c $, where $c \in \mathbb R$.
@@ -149,27 +105,41 @@ def _both_sides_mul_ineq(relation,argument,interval,variable):
     inequalities).
 
     If `interval` is present, the function returns a dictionary with intervals and solutions.
+
+    Example
+    =======
+    ```python
+    >>> from sympy import *
+    >>> from sympy_relational_tools import *
+    >>> x = symbols('x',real=True)
+    >>> ie1 = Ge(x+1,x**2,evaluate=False)
+    >>> both_sides(ie1,Mul,x,Interval(-1,1),x)
+    {Interval.Lopen(0, 1): x*(x + 1) >= x**3, Interval.Ropen(-1, 0): x*(x + 1) <= x**3, {0}: True}
+    >>> both_sides(ie1,Mul,2,Interval(-1,1),x)
+    {Interval(-1, 1): 2*x + 2 >= 2*x**2, EmptySet: True}
+    ```
     """
+    func = relation.func
     if interval is None:
-        if argument.is_positive == True:
-            return relation.func( relation.lhs*argument, relation.rhs*argument, evaluate=False )
-        elif argument.is_negative == True:
-            return _inverse_relations[relation.func]( relation.lhs*argument, relation.rhs*argument, evaluate=False )
+        if fuzzy_bool(argument.is_positive):
+            return func( relation.lhs*argument, relation.rhs*argument, evaluate=False )
+        elif fuzzy_bool(argument.is_negative):
+            return _inverse_relations[func]( relation.lhs*argument, relation.rhs*argument, evaluate=False )
         elif argument == 0:
-            return relation.func(0,0)
+            return func(0,0)
         else:
             raise ValueError("Couldn't determine sign of the argument")
     else:
         if variable is None:
             raise TypeError("If `interval` is given, a variable must be specified. Only univariable inequalities are supported")
         # Determine where in the given interval the argument is positive, negative and zero:
-        positive_interval = solveset(argument>0,variable,domain=interval)
-        negative_interval = solveset(argument<0,variable,domain=interval)
-        zeros = solveset(argument,variable,domain=interval)
+        positive_interval, negative_interval, zeros = _sign_intervals(argument,variable,interval)
         # The resulting inequalities depend on the interval of the argument
-        ans_if_positive = relation.func( relation.lhs*argument, relation.rhs*argument, evaluate=False )
-        ans_if_negative = _inverse_relations[relation.func]( relation.lhs*argument, relation.rhs*argument, evaluate=False )
-        ans_if_zero = relation.func(0,0)
+        new_lhs = relation.lhs*argument
+        new_rhs = relation.rhs*argument
+        ans_if_positive = func( new_lhs, new_rhs, evaluate=False )
+        ans_if_negative = _inverse_relations[func]( new_lhs, new_rhs, evaluate=False )
+        ans_if_zero = func(0,0)
         return {positive_interval: ans_if_positive, negative_interval: ans_if_negative, zeros: ans_if_zero }
 
 def _both_sides_pow_ineq(relation,argument,interval,variable):
@@ -193,27 +163,36 @@ def _both_sides_pow_ineq(relation,argument,interval,variable):
     Example
     =======
     ```python
+    >>> from sympy import *
     >>> from sympy_relational_tools import *
     >>> x = symbols('x',real=True)
     >>> ie1 = Ge(x,x**2,evaluate=False); ie1
     x >= x**2
     >>> both_sides(ie1,Pow,-1,Interval(-oo,oo),x)
     {Interval.open(0, oo): 1/x <= x**(-2), Interval.open(-oo, 0): 1/x >= x**(-2)}
+
+    >>> a,b = symbols('a,b',positive=True)
+    >>> c = symbols('c',negative=True)
+    >>> both_sides(Ge(a,b,evaluate=False),Pow,-1,variable=a)
+    1/a <= 1/b
+    >>> both_sides(Ge(a,c,evaluate=False),Pow,-1,variable=a)
+    1/a >= 1/c
     ```
     """
-    if argument == -1:
+    func = relation.func
+    if argument is S.NegativeOne or argument == -1:
         if interval is None:
             # Method 1: global assumptions
             if variable is None:
                 raise TypeError("If `interval` is given, a variable must be specified. Only univariable inequalities are supported")
-            if (relation.lhs.is_positive == True) and (relation.rhs.is_positive == True):
-                return relation.func( 1/relation.lhs, 1/relation.rhs, evaluate=False )
-            elif (relation.lhs.is_positive == True) and (relation.rhs.is_negative == True):
-                return relation.func( 1/relation.lhs, 1/relation.rhs, evaluate=False )
-            elif (relation.lhs.is_negative == True) and (relation.rhs.is_positive == True):
-                return relation.func( 1/relation.lhs, 1/relation.rhs, evaluate=False )
-            elif (relation.lhs.is_negative == True) and (relation.rhs.is_negative == True):
-                return _inverse_relations[relation.func]( 1/relation.lhs, 1/relation.rhs, evaluate=False )
+            lhs_sign = _sign(relation.lhs)
+            # The rhs is only queried when the sign of the lhs is known
+            rhs_sign = lhs_sign and _sign(relation.rhs)
+            if lhs_sign and rhs_sign:
+                # Same signs invert the relation, different signs keep it
+                if lhs_sign == rhs_sign:
+                    return _inverse_relations[func]( 1/relation.lhs, 1/relation.rhs, evaluate=False )
+                return func( 1/relation.lhs, 1/relation.rhs, evaluate=False )
             elif (relation.lhs == 0):
                 raise ZeroDivisionError("Can't take reciprocals with one side zero")
             elif (relation.rhs == 0):
@@ -223,41 +202,40 @@ def _both_sides_pow_ineq(relation,argument,interval,variable):
         else:
             # Method 2: solveset
             # Determine where are both sides positive or negative
-            lhs_positive_interval = solveset(relation.lhs>0,variable,domain=interval)
-            rhs_positive_interval = solveset(relation.rhs>0,variable,domain=interval)
-            lhs_negative_interval = solveset(relation.lhs<0,variable,domain=interval)
-            rhs_negative_interval = solveset(relation.rhs<0,variable,domain=interval)
+            lhs_positive_interval = _solve_sign(relation.lhs,variable,interval,1)
+            lhs_negative_interval = _solve_sign(relation.lhs,variable,interval,-1)
+            rhs_positive_interval = _solve_sign(relation.rhs,variable,interval,1)
+            rhs_negative_interval = _solve_sign(relation.rhs,variable,interval,-1)
 
             if (relation.lhs == 0):
                 raise ZeroDivisionError("Can't take reciprocals with one side zero")
             elif (relation.rhs == 0):
                 raise ZeroDivisionError("Can't take reciprocals with one side zero")
 
+            inv_lhs = 1/relation.lhs
+            inv_rhs = 1/relation.rhs
+
             # For both sides positive or negative, the relation is inversed
             pp_interval = lhs_positive_interval.intersect(rhs_positive_interval)
             nn_interval = lhs_negative_interval.intersect(rhs_negative_interval)
-            eqsigns = _inverse_relations[relation.func]( 1/relation.lhs, 1/relation.rhs, evaluate=False )
+            eqsigns = _inverse_relations[func]( inv_lhs, inv_rhs, evaluate=False )
             # For both sides of different signs, the relation is not inversed
             pn_interval = lhs_positive_interval.intersect(rhs_negative_interval)
             np_interval = lhs_negative_interval.intersect(rhs_positive_interval)
-            difsigns = relation.func( 1/relation.lhs, 1/relation.rhs, evaluate=False )
-
-            result = {}
-            if nn_interval != EmptySet():
-                result[nn_interval] = eqsigns
-            if pp_interval != EmptySet():
-                result[pp_interval] = eqsigns
-            if pn_interval != EmptySet():
-                result[pn_interval] = difsigns
-            if np_interval != EmptySet():
-                result[np_interval] = difsigns
+            difsigns = func( inv_lhs, inv_rhs, evaluate=False )
 
-            return result
+            candidates = ( (nn_interval, eqsigns), (pp_interval, eqsigns),
+                           (pn_interval, difsigns), (np_interval, difsigns) )
+            return { iv: ans for iv, ans in candidates if iv is not S.EmptySet }
 
     else:
         raise NotImplementedError("Only reciprocals (Pow,-1) are implemented")
 
 
+_ineq_handlers = { Add: _both_sides_add_ineq, Mul: _both_sides_mul_ineq, Pow: _both_sides_pow_ineq }
+_simplification_functions = frozenset([factor,simplify,collect,expand,together,apart])
+
+
 
 
 
@@ -300,6 +278,7 @@ def both_sides(relation,function,argument=None,interval=None,variable=None):
     Examples
     ========
     ```python
+    >>> from sympy import *
     >>> from sympy_relational_tools import *
     >>> x,y = symbols('x,y',real=True)
     >>> a = symbols('a',positive=True)
@@ -323,16 +302,11 @@ def both_sides(relation,function,argument=None,interval=None,variable=None):
     {Union(Interval.open(-1, 0), Interval.Lopen(0, 1)): 1/(x + 1) <= x**(-2)}
     ```
     """
-    if relation.func == Eq:
-        return Eq( function(relation.lhs,argument), function(relation.rhs,argument) )
-    else:
-        if function == Add:
-            return _both_sides_add_ineq(relation,argument)
-        elif function == Mul:
-            return _both_sides_mul_ineq(relation,argument,interval,variable)
-        elif function == Pow:
-            return _both_sides_pow_ineq(relation,argument,interval,variable)
-        elif function in [factor,simplify,collect,expand,together,apart]:
-            return relation.func( function(relation.lhs), function(relation.rhs), evaluate=False )
-        else:
-            raise NotImplementedError("Function not yet implemented")
+    if relation.func is Eq:
+        return _both_sides_eq(relation,function,argument)
+    handler = _ineq_handlers.get(function)
+    if handler is not None:
+        return handler(relation,argument,interval,variable)
+    if function in _simplification_functions:
+        return relation.func( function(relation.lhs), function(relation.rhs), evaluate=False )
+    raise NotImplementedError("Function not yet implemented")